@@ -1,45 +1,239 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, url_for
+from whitenoise import WhiteNoise
+from whitenoise.responders import StaticFile
+from wsgiref.headers import Headers
+from audit_log import create_audit_logger_from_env
+import atexit
+import hashlib
 import joblib
+import json
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 import os
+import time
+import traceback
 
 app = Flask(__name__)
 
+# Pickles behind each model; also hashed into the model version recorded by the audit log
+MODEL_FILES = {
+    # Simple Linear Regression
+    'house_price': {
+        'model': 'house_price_model.pkl',
+        'scaler': 'house_price_scaler.pkl'
+    },
+    # Multiple Linear Regression
+    'employee_salary': {
+        'model': 'employee_salary_model.pkl',
+        'preprocessor': 'salary_preprocessor.pkl',
+        'scaler': 'salary_scaler.pkl'
+    },
+    # Polynomial Regression
+    'temperature': {
+        'model': 'weather_temp_model.pkl'
+    },
+    # KNN
+    'fruit': {
+        'model': 'fruit_knn_model.pkl',
+        'scaler': 'fruit_scaler.pkl',
+        'encoder': 'fruit_label_encoder.pkl'
+    },
+    # Logistic Regression
+    'diabetes': {
+        'pipeline': 'diabetes_model_pipeline.pkl'
+    }
+}
+
 # Load all models and preprocessors
 def load_models():
-    models = {
-        # Simple Linear Regression
-        'house_price': {
-            'model': joblib.load('house_price_model.pkl'),
-            'scaler': joblib.load('house_price_scaler.pkl')
-        },
-        # Multiple Linear Regression
-        'employee_salary': {
-            'model': joblib.load('employee_salary_model.pkl'),
-            'preprocessor': joblib.load('salary_preprocessor.pkl'),
-            'scaler': joblib.load('salary_scaler.pkl')
-        },
-        # Polynomial Regression
-        'temperature': {
-            'model': joblib.load('weather_temp_model.pkl')
-        },
-        # KNN
-        'fruit': {
-            'model': joblib.load('fruit_knn_model.pkl'),
-            'scaler': joblib.load('fruit_scaler.pkl'),
-            'encoder': joblib.load('fruit_label_encoder.pkl')
-        },
-        # Logistic Regression
-        'diabetes': {
-            'pipeline': joblib.load('diabetes_model_pipeline.pkl')
-        }
-    }
+    models = {}
+    for model_id, files in MODEL_FILES.items():
+        models[model_id] = {name: joblib.load(path) for name, path in files.items()}
     return models
 
 models = load_models()
 
+# Model version = short hash of the pickles each model is loaded from
+def model_version(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+model_versions = {model_id: model_version(files.values()) for model_id, files in MODEL_FILES.items()}
+
+# Prediction audit log, written from a background thread (see audit_log.py)
+audit_logger = create_audit_logger_from_env()
+if audit_logger is not None:
+    atexit.register(audit_logger.close)
+
+# Audited routes; None means the model is named in the request body
+ENDPOINT_MODELS = {
+    '/predict_house_price': 'house_price',
+    '/predict_salary': 'employee_salary',
+    '/predict_temperature': 'temperature',
+    '/predict_fruit': 'fruit',
+    '/predict_diabetes': 'diabetes',
+    '/predict_sweep': None
+}
+
+@app.after_request
+def audit_prediction(response):
+    if audit_logger is None or request.path not in ENDPOINT_MODELS:
+        return response
+    try:
+        input_data = request.form.to_dict()
+        if not input_data:
+            # /predict_sweep accepts JSON bodies without a JSON content type
+            json_data = request.get_json(force=True, silent=True)
+            if json_data is not None:
+                input_data = json_data
+        model_id = ENDPOINT_MODELS[request.path]
+        if model_id is None and isinstance(input_data, dict):
+            model_id = input_data.get('model')
+        if not isinstance(model_id, str) or model_id not in model_versions:
+            model_id = None
+        output = response.get_json(silent=True)
+        audit_logger.log({
+            'timestamp': time.time(),
+            'endpoint': request.path,
+            'model': model_id,
+            'model_version': model_versions.get(model_id),
+            'success': bool(output and output.get('success')),
+            'input': input_data,
+            'output': output
+        })
+    except Exception:
+        # Auditing must never break a prediction response
+        traceback.print_exc()
+    return response
+
+# Fingerprinted, precompressed static assets written by build_assets.py
+ASSET_DIR = os.path.join(app.root_path, 'static_build')
+ASSET_MANIFEST_PATH = os.path.join(app.root_path, 'asset_manifest.json')
+
+def stale_static_files():
+    """Files in static/ changed since build_assets.py last wrote the manifest."""
+    manifest_mtime = os.path.getmtime(ASSET_MANIFEST_PATH)
+    stale = []
+    for root, _, files in os.walk(app.static_folder):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if os.path.getmtime(path) > manifest_mtime:
+                stale.append(os.path.relpath(path, app.static_folder))
+    return sorted(stale)
+
+def load_asset_manifest():
+    if not os.path.exists(ASSET_MANIFEST_PATH):
+        return {}
+    stale = stale_static_files()
+    if stale:
+        app.logger.warning(
+            "Static files changed since the last build_assets.py run (%s); serving static/ directly. "
+            "Rerun build_assets.py to serve the built assets.", ', '.join(stale)
+        )
+        return {}
+    with open(ASSET_MANIFEST_PATH) as f:
+        return json.load(f)
+
+asset_manifest = load_asset_manifest()
+fingerprinted_assets = {entry['name'] for entry in asset_manifest.values()}
+# Plain and fingerprinted names both get the content hash as their ETag
+asset_etags = {}
+for name, entry in asset_manifest.items():
+    asset_etags[name] = asset_etags[entry['name']] = entry['hash']
+
+def is_fingerprinted(path, url):
+    return url[len('/static/'):] in fingerprinted_assets
+
+def add_asset_headers(headers, path, url):
+    # Content hash as a strong ETag instead of WhiteNoise's mtime/size one
+    digest = asset_etags.get(url[len('/static/'):])
+    if digest:
+        headers['ETag'] = f'"{digest}"'
+
+class EncodedStaticFile(StaticFile):
+    """StaticFile whose precompressed variants carry their own strong ETag, e.g. "<hash>-gzip"."""
+
+    def get_alternatives(self, base_headers, files):
+        alternatives = []
+        for encoding_re, path, headers in super().get_alternatives(base_headers, files):
+            headers = Headers(list(headers))
+            encoding = headers.get('Content-Encoding')
+            if encoding and headers.get('ETag', '').startswith('"'):
+                headers['ETag'] = f'{headers["ETag"][:-1]}-{encoding}"'
+            alternatives.append((encoding_re, path, headers.items()))
+        return alternatives
+
+    def is_not_modified(self, request_headers):
+        # If-None-Match is compared per encoding in get_response
+        if 'HTTP_IF_NONE_MATCH' in request_headers:
+            return False
+        return super().is_not_modified(request_headers)
+
+    def get_response(self, method, request_headers):
+        if_none_match = request_headers.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None and method in ('GET', 'HEAD'):
+            path, headers = self.get_path_and_headers(request_headers)
+            if etag_matches(if_none_match, dict(headers).get('ETag')):
+                return self.get_not_modified_response(Headers(list(headers)))
+        return super().get_response(method, request_headers)
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against one ETag (RFC 7232, section 3.2)."""
+    if etag is None:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+class AssetWhiteNoise(WhiteNoise):
+    def __call__(self, environ, start_response):
+        # Let Flask serve static/ directly while debugging so edits show up without a rebuild
+        if app.debug:
+            return self.application(environ, start_response)
+        return super().__call__(environ, start_response)
+
+    def get_static_file(self, path, url, stat_cache=None):
+        static_file = super().get_static_file(path, url, stat_cache=stat_cache)
+        # Rebuild from the headers and variants WhiteNoise picked, so its own lookup logic is kept
+        base_headers, encodings = [], {}
+        for _, variant_path, headers in static_file.alternatives:
+            headers = Headers(list(headers))
+            encoding = headers.get('Content-Encoding')
+            if encoding:
+                encodings[encoding] = variant_path
+            else:
+                del headers['Content-Length']
+                base_headers = headers.items()
+        return EncodedStaticFile(path, base_headers, stat_cache=stat_cache, encodings=encodings)
+
+if asset_manifest:
+    # Served ahead of Flask; otherwise the default static handler serves static/
+    app.wsgi_app = AssetWhiteNoise(
+        app.wsgi_app,
+        root=ASSET_DIR,
+        prefix='static/',
+        immutable_file_test=is_fingerprinted,
+        add_headers_function=add_asset_headers
+    )
+
+@app.template_global()
+def asset_url(filename):
+    entry = asset_manifest.get(filename)
+    if entry is None or app.debug:
+        return url_for('static', filename=filename)
+    return url_for('static', filename=entry['name'])
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -229,6 +423,155 @@ def predict_diabetes():
             'error': str(e)
         })
 
+# What-if sweeps (response curves)
+# Largest grid a single sweep request may evaluate
+MAX_SWEEP_POINTS = 2500
+MAX_SWEEP_FEATURES = 2
+
+def sweep_house_price(frame):
+    X_scaled = models['house_price']['scaler'].transform(frame.to_numpy(dtype=float))
+    return models['house_price']['model'].predict(X_scaled).ravel()
+
+def sweep_salary(frame):
+    X_processed = models['employee_salary']['preprocessor'].transform(frame)
+    prediction_scaled = models['employee_salary']['model'].predict(X_processed)
+    return models['employee_salary']['scaler'].inverse_transform(prediction_scaled.reshape(-1, 1)).ravel()
+
+def sweep_temperature(frame):
+    return np.asarray(models['temperature']['model'].predict(frame.to_numpy(dtype=float))).ravel()
+
+def sweep_fruit(frame):
+    features_scaled = models['fruit']['scaler'].transform(frame.to_numpy(dtype=float))
+    prediction_codes = models['fruit']['model'].predict(features_scaled)
+    return models['fruit']['encoder'].inverse_transform(prediction_codes)
+
+def sweep_diabetes(frame):
+    # Probability of the positive class, in percent
+    return models['diabetes']['pipeline'].predict_proba(frame)[:, 1] * 100
+
+# Column order matches what each model was trained on
+sweep_models = {
+    'house_price': {
+        'numeric': ['SquareFootage'],
+        'categorical': [],
+        'predict': sweep_house_price
+    },
+    'employee_salary': {
+        'numeric': ['Age', 'Years of Experience'],
+        'categorical': ['Gender', 'Education Level', 'Job Title'],
+        'columns': ['Age', 'Gender', 'Education Level', 'Job Title', 'Years of Experience'],
+        'predict': sweep_salary
+    },
+    'temperature': {
+        'numeric': ['apparent_temperature_c', 'humidity', 'wind_speed_km/h', 'wind_bearing_degrees',
+                    'visibility_km', 'cloud_cover', 'pressure_millibars', 'year', 'month',
+                    'day', 'hour', 'precip_type_encoded'],
+        'categorical': [],
+        'predict': sweep_temperature
+    },
+    'fruit': {
+        'numeric': ['mass', 'width', 'height', 'color_score'],
+        'categorical': [],
+        'predict': sweep_fruit
+    },
+    'diabetes': {
+        'numeric': ['age', 'hypertension', 'heart_disease', 'bmi', 'HbA1c_level', 'blood_glucose_level'],
+        'categorical': ['gender', 'smoking_history'],
+        'columns': ['gender', 'age', 'hypertension', 'heart_disease', 'smoking_history',
+                    'bmi', 'HbA1c_level', 'blood_glucose_level'],
+        'predict': sweep_diabetes
+    }
+}
+
+def build_sweep_grid(spec, base, sweep):
+    """Expand a base input and up to two swept features into one DataFrame row per grid point."""
+    if not isinstance(base, dict):
+        raise ValueError("'base' must be an object of feature values")
+    if not isinstance(sweep, list) or not 1 <= len(sweep) <= MAX_SWEEP_FEATURES:
+        raise ValueError(f"'sweep' must be a list of 1 to {MAX_SWEEP_FEATURES} features")
+
+    ranges = {}
+    for axis in sweep:
+        if not isinstance(axis, dict) or not {'feature', 'start', 'stop'} <= axis.keys():
+            raise ValueError("Each sweep entry needs 'feature', 'start' and 'stop'")
+        feature = axis['feature']
+        if feature not in spec['numeric']:
+            raise ValueError(f"Cannot sweep feature '{feature}'")
+        if feature in ranges:
+            raise ValueError(f"Feature '{feature}' swept twice")
+        start, stop = float(axis['start']), float(axis['stop'])
+        if not (np.isfinite(start) and np.isfinite(stop)):
+            raise ValueError(f"Range for '{feature}' must be finite")
+        num = axis.get('num', 50)
+        if isinstance(num, float) and num.is_integer():
+            num = int(num)
+        if isinstance(num, bool) or not isinstance(num, int) or num < 1:
+            raise ValueError("'num' must be a positive integer")
+        ranges[feature] = (start, stop, num)
+
+    # Check the grid size before allocating any axis
+    shape = tuple(num for _, _, num in ranges.values())
+    n_points = 1
+    for num in shape:
+        n_points *= num
+    if n_points > MAX_SWEEP_POINTS:
+        raise ValueError(f"Sweep grid has {n_points} points, limit is {MAX_SWEEP_POINTS}")
+
+    axes = {feature: np.linspace(start, stop, num) for feature, (start, stop, num) in ranges.items()}
+
+    # Fixed features are broadcast across every grid point
+    columns = spec.get('columns', spec['numeric'])
+    fixed = {}
+    for column in columns:
+        if column in axes:
+            continue
+        if column not in base:
+            raise ValueError(f"Missing base value for '{column}'")
+        if column in spec['categorical']:
+            fixed[column] = str(base[column])
+        else:
+            fixed[column] = float(base[column])
+            if not np.isfinite(fixed[column]):
+                raise ValueError(f"Base value for '{column}' must be finite")
+    frame = pd.DataFrame(fixed, index=range(n_points))
+
+    grids = np.meshgrid(*axes.values(), indexing='ij')
+    for feature, grid in zip(axes, grids):
+        frame[feature] = grid.ravel()
+
+    return frame[columns], axes, shape
+
+@app.route('/predict_sweep', methods=['POST'])
+def predict_sweep():
+    try:
+        payload = request.get_json(force=True)
+        if not isinstance(payload, dict) or 'model' not in payload or 'sweep' not in payload:
+            raise ValueError("Request body must be an object with 'model', 'base' and 'sweep'")
+        model_id = payload['model']
+        if not isinstance(model_id, str) or model_id not in sweep_models:
+            raise ValueError(f"Unknown model '{model_id}'")
+        spec = sweep_models[model_id]
+
+        frame, axes, shape = build_sweep_grid(spec, payload.get('base', {}), payload['sweep'])
+
+        # One vectorized call for the whole grid
+        values = np.asarray(spec['predict'](frame))
+        if values.dtype.kind == 'f':
+            values = np.round(values, 4)
+
+        return jsonify({
+            'success': True,
+            'model': model_id,
+            'axes': {feature: np.round(grid, 4).tolist() for feature, grid in axes.items()},
+            'shape': list(shape),
+            'values': values.reshape(shape).tolist()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
 @app.route('/get_model_info', methods=['GET'])
 def get_model_info():
     return jsonify({
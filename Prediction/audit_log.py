@@ -0,0 +1,356 @@
+import argparse
+import glob
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+import warnings
+from datetime import datetime
+
+DEFAULT_SQLITE_PATH = "audit_log.sqlite3"
+DEFAULT_FILES_PATH = "audit_log.jsonl"
+
+# Sentinel telling the writer thread to flush what it has and exit
+_STOP = object()
+
+
+class SQLiteSink:
+    """Appends audit records to a SQLite table, one transaction per batch."""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self.connection = None
+
+    def check(self):
+        self.open()
+        self.close()
+
+    def open(self):
+        # Opened from the writer thread; sqlite3 connections are thread-bound.
+        # Several worker processes may write at once, so wait on the database lock.
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                endpoint TEXT NOT NULL,
+                model TEXT,
+                model_version TEXT,
+                success INTEGER,
+                input TEXT,
+                output TEXT
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS audit_log_model_time ON audit_log (model, timestamp)")
+        self.connection.commit()
+
+    def write(self, batch):
+        rows = [
+            (record["timestamp"], record["endpoint"], record["model"], record["model_version"],
+             int(bool(record["success"])), json.dumps(record["input"]), json.dumps(record["output"]))
+            for record in batch
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO audit_log (timestamp, endpoint, model, model_version, success, input, output) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def query(self, model=None, endpoint=None, since=None, limit=100):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No audit log at '{self.path}'")
+        # Read-only, so querying never creates or changes the database
+        connection = sqlite3.connect(f"{pathlib.Path(self.path).absolute().as_uri()}?mode=ro", uri=True)
+        clauses, params = [], []
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        if endpoint:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        try:
+            rows = connection.execute(
+                "SELECT timestamp, endpoint, model, model_version, success, input, output "
+                f"FROM audit_log {where} ORDER BY timestamp DESC LIMIT ?",
+                params
+            ).fetchall()
+        finally:
+            connection.close()
+        return [
+            {
+                "timestamp": row[0],
+                "endpoint": row[1],
+                "model": row[2],
+                "model_version": row[3],
+                "success": bool(row[4]),
+                "input": json.loads(row[5]),
+                "output": json.loads(row[6])
+            }
+            for row in rows
+        ]
+
+
+class RotatingFileSink:
+    """Appends audit records as JSON lines, rolling over to a timestamped file once it grows too large.
+
+    Each process appends to its own file (audit_log.<pid>.jsonl for the default path), so worker
+    processes never rotate a file another one is writing to. Rotated files are never deleted or rewritten.
+    """
+
+    def __init__(self, path=DEFAULT_FILES_PATH, max_bytes=10 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.file = None
+        self.active_path = None
+
+    def check(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory) or not os.access(directory, os.W_OK):
+            raise OSError(f"Cannot write audit log files to '{directory}'")
+
+    def open(self):
+        root, ext = os.path.splitext(self.path)
+        self.active_path = f"{root}.{os.getpid()}{ext}"
+        self.file = open(self.active_path, "a", encoding="utf-8")
+
+    def write(self, batch):
+        self.file.write("".join(json.dumps(record) + "\n" for record in batch))
+        self.file.flush()
+        if self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        self.file.close()
+        root, ext = os.path.splitext(self.active_path)
+        suffix = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        os.rename(self.active_path, f"{root}.{suffix}{ext}")
+        self.file = open(self.active_path, "a", encoding="utf-8")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def query(self, model=None, endpoint=None, since=None, limit=100):
+        records = []
+        root, ext = os.path.splitext(self.path)
+        paths = sorted(glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}"))
+        if not paths:
+            raise FileNotFoundError(f"No audit log files matching '{root}.*{ext}'")
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if model and record["model"] != model:
+                        continue
+                    if endpoint and record["endpoint"] != endpoint:
+                        continue
+                    if since is not None and record["timestamp"] < since:
+                        continue
+                    records.append(record)
+        records.sort(key=lambda record: record["timestamp"], reverse=True)
+        return records[:limit]
+
+
+class AuditLogger:
+    """Queues audit records without blocking the caller and writes them in batches from a background thread.
+
+    Records are written once `batch_size` have been collected or `flush_interval` seconds after
+    the first record of a batch, whichever comes first. When the queue is full, policy 'drop'
+    discards the record (counted in `dropped`) and policy 'block' waits for the writer to catch up.
+
+    The writer thread is started lazily, once per process, so forked servers such as
+    `gunicorn --preload` get their own writer in every worker.
+    """
+
+    def __init__(self, sink, max_queue_size=10000, policy="drop", batch_size=256, flush_interval=1.0):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown queue policy '{policy}'")
+        # Fail at startup on a bad path rather than in the writer thread
+        sink.check()
+        self.sink = sink
+        self.policy = policy
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._failed = False
+        self._closed = False
+        self.queue = None
+        self._thread = None
+
+    def _ensure_writer(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # State inherited across a fork belongs to the parent's writer; start afresh
+            self.queue = queue.Queue(maxsize=self.max_queue_size)
+            self.dropped = 0
+            self._failed = False
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def log(self, record):
+        if self._closed:
+            return
+        self._ensure_writer()
+        if self._failed:
+            self._count_dropped()
+            return
+        try:
+            if self.policy == "block":
+                self.queue.put(record)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self._count_dropped()
+
+    def _count_dropped(self, count=1):
+        with self._lock:
+            first = self.dropped == 0
+            self.dropped += count
+        if first:
+            warnings.warn(
+                f"Audit log dropped {count} record(s) in process {os.getpid()}; "
+                "later drops are only counted until the log is closed",
+                RuntimeWarning
+            )
+
+    def close(self, timeout=10):
+        if self._closed:
+            return
+        self._closed = True
+        if self._pid != os.getpid():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+            self._thread.join(timeout)
+        except queue.Full:
+            pass
+        if self._thread.is_alive() and self.queue.qsize():
+            # The writer did not finish in time; whatever is still queued is lost
+            self._count_dropped(self.queue.qsize())
+        if self.dropped:
+            warnings.warn(
+                f"Audit log dropped {self.dropped} record(s) in total in process {os.getpid()}",
+                RuntimeWarning
+            )
+
+    def _run(self):
+        try:
+            self.sink.open()
+        except Exception:
+            traceback.print_exc()
+            self._fail()
+            return
+
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+
+            # Collect until the batch is full or flush_interval has passed since its first record
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self.sink.write(batch)
+            except Exception:
+                traceback.print_exc()
+                self._count_dropped(len(batch))
+        self.sink.close()
+
+    def _fail(self):
+        # Stop accepting records and release any callers blocked on a full queue
+        self._failed = True
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            if item is _STOP:
+                return
+            self._count_dropped()
+
+
+def create_sink(backend, path=None):
+    if backend == "sqlite":
+        return SQLiteSink(path or DEFAULT_SQLITE_PATH)
+    if backend == "files":
+        return RotatingFileSink(path or DEFAULT_FILES_PATH)
+    raise ValueError(f"Unknown audit log backend '{backend}'")
+
+
+def create_audit_logger_from_env():
+    """Build an AuditLogger from AUDIT_LOG_* environment variables, or None when AUDIT_LOG_BACKEND=off."""
+    backend = os.environ.get("AUDIT_LOG_BACKEND", "sqlite")
+    if backend == "off":
+        return None
+    sink = create_sink(backend, os.environ.get("AUDIT_LOG_PATH"))
+    if isinstance(sink, RotatingFileSink) and "AUDIT_LOG_MAX_BYTES" in os.environ:
+        sink.max_bytes = int(os.environ["AUDIT_LOG_MAX_BYTES"])
+    return AuditLogger(
+        sink,
+        max_queue_size=int(os.environ.get("AUDIT_LOG_QUEUE_SIZE", 10000)),
+        policy=os.environ.get("AUDIT_LOG_POLICY", "drop"),
+        batch_size=int(os.environ.get("AUDIT_LOG_BATCH_SIZE", 256)),
+        flush_interval=float(os.environ.get("AUDIT_LOG_FLUSH_INTERVAL", 1.0))
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the prediction audit log")
+    parser.add_argument("--backend", choices=["sqlite", "files"],
+                        default=os.environ.get("AUDIT_LOG_BACKEND", "sqlite"))
+    parser.add_argument("--path", default=os.environ.get("AUDIT_LOG_PATH"))
+    parser.add_argument("--model", help="model id, e.g. diabetes")
+    parser.add_argument("--endpoint", help="request path, e.g. /predict_diabetes")
+    parser.add_argument("--since", help="ISO date or datetime, e.g. 2025-01-31T09:00")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    sink = create_sink(args.backend, args.path)
+    try:
+        records = sink.query(model=args.model, endpoint=args.endpoint, since=since, limit=args.limit)
+    except (FileNotFoundError, sqlite3.DatabaseError) as e:
+        parser.exit(1, f"error: {e}\n")
+    for record in records:
+        record["time"] = datetime.fromtimestamp(record["timestamp"]).isoformat(timespec="seconds")
+        print(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,90 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+# Keep the app from opening its own audit log; each run below installs one explicitly
+os.environ["AUDIT_LOG_BACKEND"] = "off"
+
+import app as app_module
+from audit_log import AuditLogger, create_sink
+
+FORM = {
+    "gender": "Female",
+    "age": "54",
+    "hypertension": "0",
+    "heart_disease": "0",
+    "smoking_history": "never",
+    "bmi": "27.3",
+    "hba1c": "6.6",
+    "glucose": "140"
+}
+
+
+def time_requests(client, n_requests):
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        client.post("/predict_diabetes", data=FORM)
+    return (time.perf_counter() - start) / n_requests
+
+
+def time_hook(n_calls):
+    """Time the after_request audit hook alone (record building plus AuditLogger.log)."""
+    with app_module.app.test_request_context("/predict_diabetes", method="POST", data=FORM):
+        response = app_module.app.make_response(app_module.predict_diabetes())
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            app_module.audit_prediction(response)
+        return (time.perf_counter() - start) / n_calls
+
+
+def summary(samples):
+    return f"median {statistics.median(samples) * 1e6:,.1f} us, min {min(samples) * 1e6:,.1f} us"
+
+
+def run(backend, n_requests, rounds, policy):
+    client = app_module.app.test_client()
+
+    # Warm up so first-request costs are not counted
+    app_module.audit_logger = None
+    time_requests(client, 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "audit_log.sqlite3" if backend == "sqlite" else "audit_log.jsonl")
+        logger = AuditLogger(create_sink(backend, path), policy=policy)
+
+        # Interleave the modes so drift over the run affects both equally
+        baseline, audited, hook = [], [], []
+        for _ in range(rounds):
+            app_module.audit_logger = None
+            baseline.append(time_requests(client, n_requests))
+            app_module.audit_logger = logger
+            audited.append(time_requests(client, n_requests))
+            hook.append(time_hook(n_requests))
+
+        start = time.perf_counter()
+        logger.close()
+        drain = time.perf_counter() - start
+        app_module.audit_logger = None
+
+        written = len(create_sink(backend, path).query(limit=2 * rounds * n_requests + 100))
+
+    overhead = statistics.median(audited) - statistics.median(baseline)
+    print(f"Backend: {backend}, policy: {policy}, {rounds} rounds x {n_requests} requests")
+    print(f"Without audit log:  {summary(baseline)} per request")
+    print(f"With audit log:     {summary(audited)} per request")
+    print(f"Difference of medians: {overhead * 1e6:,.1f} us per request")
+    print(f"Audit hook alone:   {summary(hook)} per call")
+    print(f"Records written: {written}, dropped: {logger.dropped}, final drain: {drain * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-request overhead of the prediction audit log")
+    parser.add_argument("--backend", choices=["sqlite", "files"], default="sqlite")
+    parser.add_argument("--policy", choices=["drop", "block"], default="drop")
+    parser.add_argument("--requests", type=int, default=200, help="requests per round and mode")
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    run(args.backend, args.requests, args.rounds, args.policy)
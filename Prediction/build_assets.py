@@ -0,0 +1,87 @@
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+
+from PIL import Image
+
+# Resolved from this file so the build lands where app.py looks for it
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+BUILD_DIR = os.path.join(BASE_DIR, "static_build")
+# Kept outside BUILD_DIR so it is not served as a static file
+MANIFEST_PATH = os.path.join(BASE_DIR, "asset_manifest.json")
+
+# Text assets worth storing a gzip variant for; PNGs are already compressed
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".html", ".svg", ".json", ".txt"}
+HASH_LENGTH = 12
+
+
+def optimize_png(data):
+    """Re-encode a PNG losslessly, keeping the original if it comes out larger."""
+    image = Image.open(io.BytesIO(data))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(data) else data
+
+
+def write_variants(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+    if os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+        # mtime=0 keeps the .gz output reproducible between builds
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data) * 0.95:
+            with open(path + ".gz", "wb") as f:
+                f.write(compressed)
+
+
+def build(static_dir, build_dir, manifest_path, reencode_png):
+    if os.path.exists(build_dir):
+        shutil.rmtree(build_dir)
+
+    manifest = {}
+    for root, _, files in os.walk(static_dir):
+        for filename in sorted(files):
+            source = os.path.join(root, filename)
+            name = os.path.relpath(source, static_dir).replace(os.sep, "/")
+
+            with open(source, "rb") as f:
+                data = f.read()
+            if reencode_png and filename.lower().endswith(".png"):
+                data = optimize_png(data)
+
+            digest = hashlib.sha256(data).hexdigest()
+            stem, ext = os.path.splitext(name)
+            hashed_name = f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+            # Keep the plain name as well so unversioned URLs still resolve
+            for output_name in (name, hashed_name):
+                output = os.path.join(build_dir, output_name)
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+                write_variants(output, data)
+
+            manifest[name] = {"name": hashed_name, "hash": digest}
+            print(f"{name} -> {hashed_name} ({len(data):,} bytes)")
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Built {len(manifest)} assets into {build_dir}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets")
+    parser.add_argument("--static-dir", default=STATIC_DIR)
+    parser.add_argument("--build-dir", default=BUILD_DIR)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--optimize-png", action="store_true", help="losslessly re-encode PNG files")
+    args = parser.parse_args()
+
+    build(args.static_dir, args.build_dir, args.manifest, args.optimize_png)